@@ -1,36 +1,51 @@
 import os
-import csv
+import hashlib
 import subprocess
-import re
 import random
+import string
 import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Satırları birleştirirken ayırıcı olarak kullanılır; temizlikte korunur
+LINE_SEPARATOR = '\0'
+
+# re.sub(r'[^a-zA-Z0-9\s]', ' ', line).lower() ile aynı işi tek C geçişinde
+# yapan tablo: harf/rakam/boşluk dışındaki her şey boşluk, büyük harf küçük olur.
+# Veri seti tamamen ASCII olduğu için ilk 256 karakter yeterli.
+CLEAN_TABLE = str.maketrans({
+    code: ' ' for code in range(256)
+    if not (chr(code).isascii() and chr(code).isalnum())
+    and not chr(code).isspace() and chr(code) != LINE_SEPARATOR
+})
+CLEAN_TABLE.update(str.maketrans(string.ascii_uppercase, string.ascii_lowercase))
 
 
 def read_in_shakespeare():
     '''Reads in the Shakespeare dataset and processes it into a list of tuples.
-       Also reads in the vocab and play name lists from files.
+       Also reads in the vocab list from a file.
     
     Returns:
         tuples: A list of (play_name, tokenized_line) tuples
-        document_names: A list of unique play names from the CSV
+        document_names: A list of unique play names from the CSV, in order of
+            first appearance, so play indices are the same on every run
         vocab: A list of all tokens in the vocabulary
     '''
-    tuples = []
-    with open('will_play_text.csv') as f:
-        csv_reader = csv.reader(f, delimiter=';')
-        for row in csv_reader:
-            play_name = row[1].strip()  
-            line = row[5] 
-            line_tokens = re.sub(r'[^a-zA-Z0-9\s]', ' ', line).split() 
-            line_tokens = [token.lower() for token in line_tokens if token]
-            
-            tuples.append((play_name, line_tokens))
+    # Sadece oyun adı (2.) ve satır metni (6.) sütunları okunur; C ayrıştırıcısı
+    df = pd.read_csv('will_play_text.csv', sep=';', header=None, usecols=[1, 5],
+                     names=['play', 'line'], dtype=str, keep_default_na=False, engine='c')
+    play_names = df['play'].str.strip()
+    # Tüm satırlar tek bir metin olarak temizlenir, sonra tekrar satırlara bölünür
+    text = LINE_SEPARATOR.join(df['line'].tolist()).translate(CLEAN_TABLE)
+    line_tokens = [line.split() for line in text.split(LINE_SEPARATOR)]
+    tuples = list(zip(play_names.tolist(), line_tokens))
 
     with open('vocab.txt') as f:
         vocab = [line.strip() for line in f if line.strip()]
-  
-    with open('play_names.txt') as f:
-        document_names = list(set([tpl[0] for tpl in tuples]))
+
+    # play_names.txt oyun adlarını değil kelime listesini içeriyor; adlar CSV'den
+    # alınır. unique() ilk görülme sırasını korur (set() her çalışmada değişirdi)
+    document_names = play_names.unique().tolist()
     
     print(f"Term-Document Matrix will be: {len(vocab)}x{len(document_names)} (|V| x D)")
     
@@ -42,8 +57,30 @@ def get_row_vector(matrix, row_id):
 def get_column_vector(matrix, col_id):
   return matrix[:, col_id]
 
+def get_token_ids(line_tuples, vocab_to_id):
+  '''Flattens the tokens of all lines into a single array of vocab ids.
+
+  Inputs:
+    line_tuples: A list of tuples, containing the name of the document and
+    a tokenized line from that document.
+    vocab_to_id: A dict mapping each vocab token to its index.
+
+  Returns:
+    word_ids: A numpy int32 array with the vocab id of every token in the
+        corpus, in order, or -1 for tokens that are not in the vocab.
+    line_ids: A numpy int32 array of the same length holding the index in
+        line_tuples of the line each token came from.
+  '''
+
+  line_lengths = np.fromiter((len(tokens) for _, tokens in line_tuples),
+                             dtype=np.int64, count=len(line_tuples))
+  word_ids = np.fromiter((vocab_to_id.get(token, -1) for _, tokens in line_tuples for token in tokens),
+                         dtype=np.int32, count=int(line_lengths.sum()))
+  line_ids = np.repeat(np.arange(len(line_tuples), dtype=np.int32), line_lengths)
+  return word_ids, line_ids
+
 def create_term_document_matrix(line_tuples, document_names, vocab):
-  '''Returns a numpy array containing the term document matrix for the input lines.
+  '''Returns a sparse matrix containing the term document matrix for the input lines.
 
   Inputs:
     line_tuples: A list of tuples, containing the name of the document and 
@@ -56,30 +93,35 @@ def create_term_document_matrix(line_tuples, document_names, vocab):
   Let m = len(vocab) and n = len(document_names).
 
   Returns:
-    td_matrix: A mxn numpy array where the number of rows is the number of words
+    td_matrix: A mxn scipy.sparse CSR matrix where the number of rows is the number of words
         and each column corresponds to a document. A_ij contains the
         frequency with which word i occurs in document j.
   '''
   vocab_to_id = {word: idx for idx, word in enumerate(vocab)}
   doc_to_id = {doc: idx for idx, doc in enumerate(document_names)}
 
-  td_matrix = np.zeros((len(vocab), len(document_names)), dtype=int)
+  n_words, n_docs = len(vocab), len(document_names)
+
+  # Her kelimenin oyununu satırının oyunundan al (-1: bilinmeyen oyun)
+  word_ids, line_ids = get_token_ids(line_tuples, vocab_to_id)
+  line_doc_ids = np.fromiter((doc_to_id.get(play_name, -1) for play_name, _ in line_tuples),
+                             dtype=np.int32, count=len(line_tuples))
+  doc_ids = line_doc_ids[line_ids]
 
-  for play_name, tokens in line_tuples:
-      if play_name not in doc_to_id:
-          continue
-      doc_id = doc_to_id[play_name]
-      for token in tokens:
-          if token in vocab_to_id:
-              word_id = vocab_to_id[token]
-              td_matrix[word_id, doc_id] += 1
+  valid = (word_ids >= 0) & (doc_ids >= 0)
+  word_ids, doc_ids = word_ids[valid], doc_ids[valid]
+  # COO -> CSR dönüşümü tekrar eden (kelime, oyun) çiftlerini toplar
+  td_matrix = sp.coo_matrix((np.ones(len(word_ids), dtype=int), (word_ids, doc_ids)),
+                            shape=(n_words, n_docs)).tocsr()
 
-  singletons = np.sum(np.sum(td_matrix, axis=1) == 1)
+  # Hapax sayımı matris yerine zaten elimizdeki id dizisinden yapılır
+  word_totals = np.bincount(word_ids, minlength=n_words)
+  singletons = int(np.sum(word_totals == 1))
   print(f"Number of hapax legomena (singletons): {singletons}")
   return td_matrix
 
 def create_term_context_matrix(line_tuples, vocab, context_window_size=1):
-  '''Returns a numpy array containing the term context matrix for the input lines.
+  '''Returns a sparse matrix containing the term context matrix for the input lines.
 
   Inputs:
     line_tuples: A list of tuples, containing the name of the document and 
@@ -91,7 +133,7 @@ def create_term_context_matrix(line_tuples, vocab, context_window_size=1):
   Let n = len(vocab).
 
   Returns:
-    tc_matrix: A nxn numpy array where A_ij contains the frequency with which
+    tc_matrix: A nxn scipy.sparse CSR matrix where A_ij contains the frequency with which
         word j was found within context_window_size to the left or right of
         word i in any sentence in the tuples.
   '''
@@ -99,22 +141,24 @@ def create_term_context_matrix(line_tuples, vocab, context_window_size=1):
   vocab_to_id = dict(zip(vocab, range(0, len(vocab))))
 
   n = len(vocab)
-  tc_matrix = np.zeros((n, n), dtype=int)
-
-  for _, tokens in line_tuples:
-    for i, target_word in enumerate(tokens):
-      if target_word not in vocab_to_id:
-        continue
-      target_id = vocab_to_id[target_word]
-      left = max(0, i - context_window_size)
-      right = min(len(tokens), i + context_window_size + 1)
-      for j in range(left, right):
-        if i == j:
-          continue
-        context_word = tokens[j]
-        if context_word in vocab_to_id:
-          context_id = vocab_to_id[context_word]
-          tc_matrix[target_id][context_id] += 1
+
+  # line_ids pencerenin satır sınırını aşmasını engellemek için kullanılır
+  word_ids, line_ids = get_token_ids(line_tuples, vocab_to_id)
+
+  targets = []
+  contexts = []
+  for offset in range(1, context_window_size + 1):
+    left, right = word_ids[:-offset], word_ids[offset:]
+    valid = (line_ids[:-offset] == line_ids[offset:]) & (left >= 0) & (right >= 0)
+    left, right = left[valid], right[valid]
+    # Pencere simetrik: sağdaki kelime soldakinin bağlamı, ve tersi
+    targets.extend([left, right])
+    contexts.extend([right, left])
+
+  targets = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int32)
+  contexts = np.concatenate(contexts) if contexts else np.zeros(0, dtype=np.int32)
+  tc_matrix = sp.coo_matrix((np.ones(len(targets), dtype=int), (targets, contexts)),
+                            shape=(n, n)).tocsr()
   return tc_matrix
 
 def create_PPMI_matrix(term_context_matrix):
@@ -125,23 +169,31 @@ def create_PPMI_matrix(term_context_matrix):
   Hint: Use numpy matrix and vector operations to speed up implementation.
   
   Input:
-    term_context_matrix: A nxn numpy array, where n is
+    term_context_matrix: A nxn numpy array or scipy.sparse matrix, where n is
         the numer of tokens in the vocab.
   
-  Returns: A nxn numpy matrix, where A_ij is equal to the
+  Returns: A nxn float32 scipy.sparse CSR matrix, where A_ij is equal to the
      point-wise mutual information between the ith word
      and the jth word in the term_context_matrix.
   '''       
   
-  total_sum = np.sum(term_context_matrix)
-  row_sum = np.sum(term_context_matrix, axis=1)
-  col_sum = np.sum(term_context_matrix, axis=0)
-  expected = np.outer(row_sum, col_sum) / total_sum
-  with np.errstate(divide='ignore', invalid='ignore'):
-    ppmi = np.log2((term_context_matrix * total_sum) / expected)
-    ppmi[np.isnan(ppmi)] = 0.0
-    ppmi[np.isinf(ppmi)] = 0.0
-    ppmi[ppmi < 0] = 0.0
+  tc = sp.coo_matrix(term_context_matrix)
+  total_sum = tc.sum()
+  row_sum = np.asarray(tc.sum(axis=1)).ravel()
+  col_sum = np.asarray(tc.sum(axis=0)).ravel()
+  with np.errstate(divide='ignore'):
+    log_row_sum = np.log2(row_sum, dtype=np.float32)
+    log_col_sum = np.log2(col_sum, dtype=np.float32)
+
+  # Sıfır hücrelerin PPMI değeri zaten 0; sadece dolu hücreler hesaplanır.
+  # log2(c * N / (r * k)) = log2(c) + log2(N) - log2(r) - log2(k), yerinde
+  ppmi_values = np.log2(tc.data, dtype=np.float32)
+  ppmi_values += np.float32(np.log2(total_sum))
+  ppmi_values -= log_row_sum[tc.row]
+  ppmi_values -= log_col_sum[tc.col]
+  np.maximum(ppmi_values, 0.0, out=ppmi_values)
+  ppmi = sp.coo_matrix((ppmi_values, (tc.row, tc.col)), shape=tc.shape).tocsr()
+  ppmi.eliminate_zeros()
   return ppmi
 
 def create_tf_idf_matrix(term_document_matrix):
@@ -152,18 +204,21 @@ def create_tf_idf_matrix(term_document_matrix):
   Hint: Use numpy matrix and vector operations to speed up implementation.
 
   Input:
-    term_document_matrix: Numpy array where each column represents a document 
-    and each row, the frequency of a word in that document.
+    term_document_matrix: Numpy array or scipy.sparse matrix where each column
+    represents a document and each row, the frequency of a word in that document.
 
   Returns:
-    A numpy array with the same dimension as term_document_matrix, where
+    A float32 scipy.sparse CSR matrix with the same dimension as term_document_matrix, where
     A_ij is weighted by the inverse document frequency of document h.
   '''
 
-  tf = term_document_matrix
-  df = np.count_nonzero(term_document_matrix, axis=1)
-  idf = np.log(tf.shape[1] / (df + 1e-10))
-  tf_idf = tf * idf[:, np.newaxis]
+  # Benzerlik araması için float32 hassasiyeti yeterli, bellek yarıya iner.
+  # Kopya alınır ki aşağıdaki yerinde çarpma girdiyi değiştirmesin
+  tf_idf = sp.csr_matrix(term_document_matrix, dtype=np.float32, copy=True)
+  df = tf_idf.getnnz(axis=1)
+  idf = np.log(tf_idf.shape[1] / (df + 1e-10)).astype(np.float32)
+  # Her dolu hücreyi satırının idf değeriyle yerinde çarp; ikinci bir matris oluşmaz
+  tf_idf.data *= np.repeat(idf, np.diff(tf_idf.indptr))
   return tf_idf
 
 def compute_cosine_similarity(vector1, vector2):
@@ -218,89 +273,344 @@ def compute_dice_similarity(vector1, vector2):
     return 0.0
   return 2 * intersection / total
 
-def rank_plays(target_play_index, term_document_matrix, similarity_fn):
+def normalize_rows(matrix, dtype=np.float32):
+  '''Returns a CSR copy of matrix where every non-zero row has unit L2 norm.
+
+  float32 (the default) halves the memory traffic of the vocabulary-sized
+  matrix products that use the result. Scores that differ by less than float32
+  precision may then swap places in a ranking.
+  '''
+
+  vectors = sp.csr_matrix(matrix, dtype=dtype)
+  norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+  norms[norms == 0] = 1.0
+  return (sp.diags(1.0 / norms) @ vectors).tocsr()
+
+def compute_cosine_similarity_matrix(matrix, axis=1):
+  '''Computes the cosine similarity between every pair of vectors in matrix.
+
+  The vectors are normalized once, so all pairwise similarities come out of
+  a single matrix product. The result is dense, so this is meant for a small
+  number of vectors (e.g. the plays), not the whole vocabulary. It is computed
+  in float64: play cosines on raw counts are often only 1e-6 apart, and for
+  this few vectors float32 would save nothing.
+
+  Inputs:
+    matrix: A numpy array or scipy.sparse matrix.
+    axis: 0 if each column of matrix is a vector, 1 if each row is a vector.
+
+  Returns:
+    A kxk numpy array, where k is the number of vectors and A_ij is the cosine
+    similarity of vectors i and j.
+  '''
+
+  normalized = normalize_rows(matrix.T if axis == 0 else matrix, dtype=np.float64)
+  return (normalized @ normalized.T).toarray()
+
+# Bir bayttaki 1 bitlerinin sayısı (np.bitwise_count olmayan numpy sürümleri için)
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def pack_presence(matrix):
+  '''Packs the presence (entry > 0) of every row of matrix into a bitmap.
+
+  Inputs:
+    matrix: A numpy array or scipy.sparse matrix.
+
+  Returns:
+    A numpy uint64 array with one row per row of matrix, where bit j of row i
+    (counting in bytes from the left) is set when matrix[i, j] > 0.
+  '''
+
+  presence = sp.csr_matrix(sp.csr_matrix(matrix) > 0)
+  n_rows, n_cols = presence.shape
+  # Satırlar 8 baytın katına tamamlanır ki uint64 olarak görüntülenebilsin
+  n_bytes = -(-n_cols // 64) * 8
+  packed = np.zeros((n_rows, n_bytes), dtype=np.uint8)
+  rows = np.repeat(np.arange(n_rows), np.diff(presence.indptr))
+  cols = presence.indices
+  np.bitwise_or.at(packed, (rows, cols >> 3), (128 >> (cols & 7)).astype(np.uint8))
+  return packed.view(np.uint64)
+
+def count_bits(packed):
+  '''Returns the number of set bits in every row of a bitmap from pack_presence.'''
+
+  if hasattr(np, 'bitwise_count'):
+    return np.bitwise_count(packed).sum(axis=1, dtype=np.int64)
+  return POPCOUNT_TABLE[packed.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+class SimilarityIndex:
+  '''Caches the per-vector data the similarity functions need for a matrix.
+
+  The L2-normalized vectors, the presence mask (entry > 0) and the number of
+  non-zero entries of every vector are computed once, so ranking many targets
+  or using several similarity functions on the same matrix doesn't recompute
+  norms and counts for every pair.
+
+  When there are at most PAIRWISE_LIMIT vectors, all pairwise cosine
+  similarities are computed with compute_cosine_similarity_matrix on first use
+  and reused for every later cosine query; larger indexes keep float32
+  normalized vectors and do one sparse matrix-vector product per target. The presence mask is bit-packed (see
+  pack_presence) when the vectors are dense enough for the bitmap to be
+  smaller than the sparse representation.
+
+  Inputs:
+    matrix: A numpy array or scipy.sparse matrix holding the vectors to compare.
+    axis: 0 if each column of matrix is a vector (e.g. the term-document
+      matrix), 1 if each row is a vector (e.g. word embeddings).
+  '''
+
+  PAIRWISE_LIMIT = 2000
+  DENSE_BLOCK_ROWS = 256
+
+  def __init__(self, matrix, axis=1):
+    self.vectors = sp.csr_matrix(matrix.T if axis == 0 else matrix)
+    self.normalized = normalize_rows(self.vectors) if len(self) > self.PAIRWISE_LIMIT else None
+    self.cosine_matrix = None
+    presence = sp.csr_matrix(self.vectors > 0)
+    self.counts = presence.getnnz(axis=1)
+    # Ortalama her 64 bitlik kelimede en az bir dolu hücre varsa bit maskesi,
+    # yoksa (ör. terim-bağlam matrisi) CSR daha az bellek okur
+    if presence.nnz * 64 >= presence.shape[0] * presence.shape[1]:
+      self.presence = pack_presence(presence)
+    else:
+      self.presence = presence.astype(np.int32)
+
+  def __len__(self):
+    return self.vectors.shape[0]
+
+  def cosine_scores(self, target_index):
+    if len(self) <= self.PAIRWISE_LIMIT:
+      if self.cosine_matrix is None:
+        self.cosine_matrix = compute_cosine_similarity_matrix(self.vectors)
+      return self.cosine_matrix[target_index]
+    return (self.normalized @ self.normalized[target_index].T).toarray().ravel()
+
+  def _intersections(self, target_index):
+    if isinstance(self.presence, np.ndarray):
+      return count_bits(self.presence & self.presence[target_index])
+    return (self.presence @ self.presence[target_index].T).toarray().ravel()
+
+  def jaccard_scores(self, target_index):
+    intersections = self._intersections(target_index)
+    unions = self.counts + self.counts[target_index] - intersections
+    with np.errstate(divide='ignore', invalid='ignore'):
+      return np.where(unions == 0, 0.0, intersections / unions)
+
+  def dice_scores(self, target_index):
+    intersections = self._intersections(target_index)
+    totals = self.counts + self.counts[target_index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+      return np.where(totals == 0, 0.0, 2 * intersections / totals)
+
+  def scores(self, target_index, similarity_fn):
+    '''Returns the similarity of every vector to the vector at target_index.
+
+    Cosine, jaccard and dice use the cached data; any other similarity_fn
+    falls back to calling it once per pair.
+    '''
+    if similarity_fn is compute_cosine_similarity:
+      return self.cosine_scores(target_index)
+    if similarity_fn is compute_jaccard_similarity:
+      return self.jaccard_scores(target_index)
+    if similarity_fn is compute_dice_similarity:
+      return self.dice_scores(target_index)
+    target_vector = self.vectors[target_index].toarray().ravel()
+    scores = np.empty(len(self))
+    # Satırlar blok blok yoğunlaştırılır; her vektör bitişik (C sıralı) bir satır olur
+    for start in range(0, len(self), self.DENSE_BLOCK_ROWS):
+      block = self.vectors[start:start + self.DENSE_BLOCK_ROWS].toarray()
+      for offset, vector in enumerate(block):
+        scores[start + offset] = similarity_fn(target_vector, vector)
+    return scores
+
+def order_by_similarity(similarities, target_index, top_k=None):
+  '''Returns the indices of similarities ordered from most to least similar.
+
+  The target itself is left out, and ties keep their index order. When top_k
+  is given only the top_k best indices are returned: they are selected with
+  np.partition in linear time and only those are sorted, instead of sorting
+  every score.
+  '''
+
+  similarities = np.asarray(similarities, dtype=np.float64).copy()
+  similarities[target_index] = -np.inf
+  n_candidates = len(similarities) - 1
+
+  if top_k is None or top_k >= n_candidates:
+    candidates = np.arange(len(similarities))
+    top_k = n_candidates
+  else:
+    # k. en büyük skorla eşit olanların hepsi aday kalır ki eşitlikler
+    # tam sıralamadaki gibi düşük indeks lehine çözülsün
+    threshold = np.partition(similarities, -top_k)[-top_k]
+    candidates = np.flatnonzero(similarities >= threshold)
+
+  order = np.lexsort((candidates, -similarities[candidates]))
+  return [int(i) for i in candidates[order[:top_k]]]
+
+def rank_plays(target_play_index, term_document_matrix, similarity_fn, top_k=None, return_scores=False):
   ''' Ranks the similarity of all of the plays to the target play.
 
   # NOTE: THIS DOCSTRING WAS UPDATED ON JAN 24, 12:51 PM.
 
   Inputs:
     target_play_index: The integer index of the play we want to compare all others against.
-    term_document_matrix: The term-document matrix as a mxn numpy array.
+    term_document_matrix: The term-document matrix as a mxn numpy array or sparse matrix, or a
+      SimilarityIndex already built from it with axis=0.
     similarity_fn: Function that should be used to compared vectors for two
       documents. Either compute_dice_similarity, compute_jaccard_similarity, or
       compute_cosine_similarity.
+    top_k: If given, only the top_k most similar plays are returned.
+    return_scores: If True, the similarity scores of the ranked plays are
+      returned as well.
 
   Returns:
     A length-n list of integer indices corresponding to play names,
-    ordered by decreasing similarity to the play indexed by target_play_index
+    ordered by decreasing similarity to the play indexed by target_play_index.
+    If return_scores is True, a (ranks, scores) tuple where scores[i] is the
+    similarity of play ranks[i].
   '''
   
-  target_vector = term_document_matrix[:, target_play_index]  # Sütun vektörü al
-  similarities = []
-    
-  for i in range(term_document_matrix.shape[1]):
-      if i == target_play_index:
-          continue
-      current_vector = term_document_matrix[:, i]  # Diğer sütun vektörleri
-      sim = similarity_fn(target_vector, current_vector)
-      similarities.append((i, sim))
-    
-  # Benzerliğe göre sırala (yüksekten düşüğe)
-  similarities.sort(key=lambda x: x[1], reverse=True)
-  return [i for i, _ in similarities]
+  # Oyunlar sütun olduğu için indeks transpozu saklar: her oyun bellekte
+  # bitişik bir CSR satırıdır, sütun dilimlemedeki adımlı erişim olmaz
+  index = term_document_matrix
+  if not isinstance(index, SimilarityIndex):
+    index = SimilarityIndex(term_document_matrix, axis=0)
+  similarities = index.scores(target_play_index, similarity_fn)
 
+  # Benzerliğe göre sırala (yüksekten düşüğe)
+  ranks = order_by_similarity(similarities, target_play_index, top_k)
+  if return_scores:
+    return ranks, similarities[ranks]
+  return ranks
 
-def rank_words(target_word_index, matrix, similarity_fn):
+def rank_words(target_word_index, matrix, similarity_fn, top_k=None, return_scores=False):
   ''' Ranks the similarity of all of the words to the target word.
 
   # NOTE: THIS DOCSTRING WAS UPDATED ON JAN 24, 12:51 PM.
 
   Inputs:
     target_word_index: The index of the word we want to compare all others against.
-    matrix: Numpy matrix where the ith row represents a vector embedding of the ith word.
+    matrix: Numpy or sparse matrix where the ith row represents a vector embedding of the ith word,
+      or a SimilarityIndex already built from it.
     similarity_fn: Function that should be used to compared vectors for two word
       ebeddings. Either compute_dice_similarity, compute_jaccard_similarity, or
       compute_cosine_similarity.
+    top_k: If given, only the top_k most similar words are returned.
+    return_scores: If True, the similarity scores of the ranked words are
+      returned as well.
 
   Returns:
     A length-n list of integer word indices, ordered by decreasing similarity to the 
-    target word indexed by word_index
+    target word indexed by word_index. If return_scores is True, a (ranks, scores)
+    tuple where scores[i] is the similarity of word ranks[i].
   '''
 
-  target_vector = get_row_vector(matrix, target_word_index)
-  similarities = []
-  for i in range(matrix.shape[0]):
-    if i == target_word_index:
-      continue
-    vec = get_row_vector(matrix, i)
-    sim = similarity_fn(target_vector, vec)
-    similarities.append((i, sim))
-  similarities.sort(key=lambda x: x[1], reverse=True)
-  return [i for i, _ in similarities]
+  index = matrix if isinstance(matrix, SimilarityIndex) else SimilarityIndex(matrix)
+  similarities = index.scores(target_word_index, similarity_fn)
+  ranks = order_by_similarity(similarities, target_word_index, top_k)
+  if return_scores:
+    return ranks, similarities[ranks]
+  return ranks
+
+CACHE_DIR = '.cache'
+CACHED_MATRICES = ['td', 'tf_idf', 'tc', 'PPMI']
+# create_* fonksiyonlarından biri değiştiğinde artırılmalı; yoksa eski
+# önbellekteki matrisler sessizce kullanılmaya devam eder
+CACHE_VERSION = 1
+
+def get_cache_key(input_paths, context_window_size):
+  '''Returns a short hash identifying the input files and settings.
+
+  The modification time and size of every input file are hashed, so editing
+  any of them invalidates the cached matrices. CACHE_VERSION is hashed too,
+  so bumping it after changing a matrix builder invalidates them as well.
+  '''
 
+  key = hashlib.blake2b(digest_size=8)
+  for path in input_paths:
+    stat = os.stat(path)
+    key.update(f'{path}:{stat.st_mtime_ns}:{stat.st_size};'.encode())
+  key.update(f'window={context_window_size};version={CACHE_VERSION}'.encode())
+  return key.hexdigest()
 
-if __name__ == '__main__':
-    tuples, document_names, vocab = read_in_shakespeare()
+def load_or_build_matrices(context_window_size=4):
+  '''Loads the matrices from the on-disk cache, building and caching them if needed.
 
-    print('Computing term document matrix...')
-    td_matrix = create_term_document_matrix(tuples, document_names, vocab)
+  The matrix shape and the number of hapax legomena are printed in both
+  cases; on a cache hit they are derived from the loaded matrices.
 
-    print('Computing tf-idf matrix...')
-    tf_idf_matrix = create_tf_idf_matrix(td_matrix)
+  Inputs:
+    context_window_size: Passed on to create_term_context_matrix.
+
+  Returns:
+    document_names: A list of the play names, in the order of the matrix columns.
+    vocab: A list of the tokens in the vocabulary.
+    matrices: A dict with the 'td', 'tf_idf', 'tc' and 'PPMI' scipy.sparse matrices.
+  '''
+
+  cache_path = os.path.join(CACHE_DIR, get_cache_key(['will_play_text.csv', 'vocab.txt'], context_window_size))
+  names_path = os.path.join(cache_path, 'document_names.txt')
+
+  # Oyun adları en son yazılır; dosya varsa önbellek eksiksizdir
+  if os.path.exists(names_path):
+    print(f'Loading cached matrices from {cache_path}...')
+    with open('vocab.txt') as f:
+      vocab = [line.strip() for line in f if line.strip()]
+    with open(names_path) as f:
+      document_names = [line.rstrip('\n') for line in f]
+    matrices = {name: sp.load_npz(os.path.join(cache_path, f'{name}.npz')).tocsr()
+                for name in CACHED_MATRICES}
+    print(f"Term-Document Matrix will be: {len(vocab)}x{len(document_names)} (|V| x D)")
+    singletons = int(np.sum(np.asarray(matrices['td'].sum(axis=1)).ravel() == 1))
+    print(f"Number of hapax legomena (singletons): {singletons}")
+    return document_names, vocab, matrices
 
-    print('Computing term context matrix...')
-    tc_matrix = create_term_context_matrix(tuples, vocab, context_window_size=4)
+  tuples, document_names, vocab = read_in_shakespeare()
 
-    print('Computing PPMI matrix...')
-    PPMI_matrix = create_PPMI_matrix(tc_matrix)
+  print('Computing term document matrix...')
+  td_matrix = create_term_document_matrix(tuples, document_names, vocab)
+
+  print('Computing tf-idf matrix...')
+  tf_idf_matrix = create_tf_idf_matrix(td_matrix)
+
+  print('Computing term context matrix...')
+  tc_matrix = create_term_context_matrix(tuples, vocab, context_window_size=context_window_size)
+
+  print('Computing PPMI matrix...')
+  PPMI_matrix = create_PPMI_matrix(tc_matrix)
+
+  matrices = {'td': td_matrix, 'tf_idf': tf_idf_matrix, 'tc': tc_matrix, 'PPMI': PPMI_matrix}
+  os.makedirs(cache_path, exist_ok=True)
+  for name in CACHED_MATRICES:
+    sp.save_npz(os.path.join(cache_path, f'{name}.npz'), matrices[name], compressed=False)
+  with open(names_path, 'w') as f:
+    f.writelines(f'{name}\n' for name in document_names)
+  return document_names, vocab, matrices
+
+
+if __name__ == '__main__':
+    document_names, vocab, matrices = load_or_build_matrices(context_window_size=4)
+    td_matrix = matrices['td']
+    tf_idf_matrix = matrices['tf_idf']
+    tc_matrix = matrices['tc']
+    PPMI_matrix = matrices['PPMI']
 
     random_idx = random.randint(0, len(document_names)-1)
     print("\nSelected play:", document_names[random_idx])
     
+    # Norm ve sayımlar her matris için bir kez hesaplanır, tüm sorgularda kullanılır
+    td_index = SimilarityIndex(td_matrix, axis=0)
+    tf_idf_index = SimilarityIndex(tf_idf_matrix, axis=0)
+    tc_index = SimilarityIndex(tc_matrix)
+    PPMI_index = SimilarityIndex(PPMI_matrix)
+
     similarity_fns = [compute_cosine_similarity, compute_jaccard_similarity, compute_dice_similarity]
-    for sim_fn in similarity_fns:
+    # (sıralama, skor) çiftleri tablolarda tekrar kullanılmak üzere saklanır
+    td_rankings = {sim_fn: rank_plays(random_idx, td_index, sim_fn, top_k=10, return_scores=True)
+                   for sim_fn in similarity_fns}
+    for sim_fn, (ranks, _) in td_rankings.items():
         print('\nThe 10 most similar plays to "%s" using %s are:' % (document_names[random_idx], sim_fn.__qualname__))
-        ranks = rank_plays(random_idx, td_matrix, sim_fn)
         
         if len(ranks) < 10:
             print(f"Warning: Only {len(ranks)} similar plays found")
@@ -312,16 +622,21 @@ if __name__ == '__main__':
     word = 'gain'
     vocab_to_index = dict(zip(vocab, range(0, len(vocab))))
     
+    tc_rankings = {}
+    PPMI_rankings = {}
     if word in vocab_to_index: 
         for sim_fn in similarity_fns:
+            tc_rankings[sim_fn] = rank_words(vocab_to_index[word], tc_index, sim_fn, top_k=10, return_scores=True)
+            PPMI_rankings[sim_fn] = rank_words(vocab_to_index[word], PPMI_index, sim_fn, top_k=10, return_scores=True)
+            ranks, _ = tc_rankings[sim_fn]
+            ppmi_ranks, _ = PPMI_rankings[sim_fn]
             print('\nThe 10 most similar words to "%s" using %s on term-context frequency matrix are:' % (word, sim_fn.__qualname__))
-            ranks = rank_words(vocab_to_index[word], tc_matrix, sim_fn)
             for idx in range(0, min(10, len(ranks))):
                 word_id = ranks[idx]
                 print('%d: %s' % (idx+1, vocab[word_id]))
 
             print('\nThe 10 most similar words to "%s" using %s on PPMI matrix are:' % (word, sim_fn.__qualname__))
-            ranks = rank_words(vocab_to_index[word], PPMI_matrix, sim_fn)
+            ranks = ppmi_ranks
             for idx in range(0, min(10, len(ranks))):
                 word_id = ranks[idx]
                 print('%d: %s' % (idx+1, vocab[word_id]))
@@ -332,7 +647,7 @@ if __name__ == '__main__':
     # EXTRA: Tablolu çıktı üretmek için eklendi
     # ============================================
 
-    def print_play_similarity_tables(play_index, matrix, matrix_name):
+    def print_play_similarity_tables(play_index, index, matrix_name, rankings=None):
         print(f"\n--- Top 10 similar plays to \"{document_names[play_index]}\" using {matrix_name} ---")
         similarity_functions = [
             ("Cosine", compute_cosine_similarity),
@@ -340,15 +655,14 @@ if __name__ == '__main__':
             ("Dice", compute_dice_similarity)
         ]
 
+        # rankings: önceden hesaplanmış {fn: (sıralama, skor)}; eksikler burada hesaplanır
+        rankings = rankings or {}
         scores_by_method = {}
         for name, fn in similarity_functions:
-            ranks = rank_plays(play_index, matrix, fn)
-            scores = []
-            for i in range(10):
-                idx = ranks[i]
-                score = fn(get_column_vector(matrix, play_index), get_column_vector(matrix, idx))
-                scores.append((document_names[idx], score))
-            scores_by_method[name] = scores
+            if fn not in rankings:
+                rankings[fn] = rank_plays(play_index, index, fn, top_k=10, return_scores=True)
+            ranks, scores = rankings[fn]
+            scores_by_method[name] = [(document_names[idx], score) for idx, score in zip(ranks, scores)]
 
         print(f"{'Rank':<5} {'Cosine Similarity':<30} {'Jaccard Similarity':<30} {'Dice Similarity':<30}")
         print("-" * 100)
@@ -359,7 +673,7 @@ if __name__ == '__main__':
             print(f"{i+1:<5} {c:<30} {j:<30} {d:<30}")
 
 
-    def print_word_similarity_tables(word, matrix, matrix_name):
+    def print_word_similarity_tables(word, index, matrix_name, rankings=None):
         print(f"\n--- Top 10 similar words to \"{word}\" using {matrix_name} ---")
         similarity_functions = [
             ("Cosine", compute_cosine_similarity),
@@ -370,14 +684,12 @@ if __name__ == '__main__':
         word_index = vocab.index(word)
         scores_by_method = {}
 
+        rankings = rankings or {}
         for name, fn in similarity_functions:
-            ranks = rank_words(word_index, matrix, fn)
-            scores = []
-            for i in range(10):
-                idx = ranks[i]
-                score = fn(get_row_vector(matrix, word_index), get_row_vector(matrix, idx))
-                scores.append((vocab[idx], score))
-            scores_by_method[name] = scores
+            if fn not in rankings:
+                rankings[fn] = rank_words(word_index, index, fn, top_k=10, return_scores=True)
+            ranks, scores = rankings[fn]
+            scores_by_method[name] = [(vocab[idx], score) for idx, score in zip(ranks, scores)]
 
         print(f"{'Rank':<5} {'Cosine Similarity':<30} {'Jaccard Similarity':<30} {'Dice Similarity':<30}")
         print("-" * 100)
@@ -388,10 +700,10 @@ if __name__ == '__main__':
             print(f"{i+1:<5} {c:<30} {j:<30} {d:<30}")
 
     # 🔸 Oyun benzerliği tabloları:
-    print_play_similarity_tables(random_idx, td_matrix, "Term-Document")
-    print_play_similarity_tables(random_idx, tf_idf_matrix, "TF-IDF")
+    print_play_similarity_tables(random_idx, td_index, "Term-Document", td_rankings)
+    print_play_similarity_tables(random_idx, tf_idf_index, "TF-IDF")
 
     # 🔸 Kelime benzerliği tabloları:
     if word in vocab:
-        print_word_similarity_tables(word, tc_matrix, "Term-Context Frequency Matrix")
-        print_word_similarity_tables(word, PPMI_matrix, "PPMI Matrix")
\ No newline at end of file
+        print_word_similarity_tables(word, tc_index, "Term-Context Frequency Matrix", tc_rankings)
+        print_word_similarity_tables(word, PPMI_index, "PPMI Matrix", PPMI_rankings)
\ No newline at end of file